@@ -1,20 +1,102 @@
 import argparse
 import sys
 import subprocess
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 import re
 import json
-import numpy as np
 import sys
 
-def run_command( command, timeout=None):
+# orjson (C serializer) is much faster for big diff maps, but it's optional
+# note: orjson only supports indenting by 2
+try:
+	import orjson
+	def dumps_json( obj):
+		return( orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+except ImportError:
+	def dumps_json( obj):
+		return( json.dumps(obj, indent=4).encode('utf-8'))
+
+# prefixes of the lines in the test output that mark what kind of output they are
+# the diff marker ("< " or "> ") is not included. note that the order matters: if one prefix is a prefix of
+# another (e.g. "in_" and "in_cb_") then the longer one has to come first
+_DIFF_LINE_TAGS = [
+	("error", "error_"),
+	("done", "done_"),
+	("ret_val", "ret_val_"),
+	("ret_val_no_sep", "ret_val"),
+	("after", "after_"),
+	("before", "before_"),
+	("in_cb", "in_cb_"),
+	("in_arg", "in_"),
+	("callback_exec", "callback_exec_"),
+	("async_error", "{\\\"async_error_in_test"),
+	("test_passed", "    ✓"),
+	("test_id", "test_id"),
+]
+_CALL_DONE_TAGS = ("done", "ret_val", "ret_val_no_sep")
+_IN_CALLBACK_TAGS = ("in_cb", "in_arg")
+_ARG_VALUE_TAGS = ("before", "after")
+_FUNCTION_ARG_PREFIXES = ("class ", "function ", "async ", "(")
+
+def build_diff_line_tag_re( marker):
+	tags = [ "(?P<" + name + ">" + re.escape(prefix) + ")" for (name, prefix) in _DIFF_LINE_TAGS]
+	# whitespace artifact on test completion
+	tags += [ "(?P<test_done>" + re.escape("\n" + marker + "   test") + ")"]
+	return( re.compile( re.escape(marker + " ") + "(?:" + "|".join(tags) + ")"))
+
+_NEWV_TAG_RE = build_diff_line_tag_re("<")
+_OLDV_TAG_RE = build_diff_line_tag_re(">")
+
+# errors in the new commit test output, in order of priority
+# (named with the diagnosis they correspond to)
+_NEWV_ERROR_MSGS = [
+	("Local_file_renamed_or_removed", "Cannot find module '."), # this indicates a local module dependency that is not available in the newer commit
+	# happens when a file is renamed or deleted. Will not happen with commit_oldv since the tests are gen'd for this commit
+	("Nonlocal_dependency_removed", "Cannot find module '"), # this indicates a NON-local module dependency that is not available in the newer commit
+	("Grub_node_version_mismatch", "ReferenceError: primordials is not defined"), # common error indicating a mismatch between grub and nodejs versions
+	# see: https://stackoverflow.com/questions/55921442/how-to-fix-referenceerror-primordials-is-not-defined-in-node
+	("Env_ref_not_included", "ReferenceError: "), # environment reference not included (primordials is one example)
+	("Syntax_err", "SyntaxError: "), # syntax error in new tests, due to language upgrade (probably CJS --> ESM)
+]
+_NEWV_ERROR_RE = re.compile( "|".join([ "(?P<" + name + ">" + re.escape(msg) + ")" for (name, msg) in _NEWV_ERROR_MSGS]))
+
+# json noise after the diff marker: any of [, { and " (in that order), right after "< " or "> "
+_JSON_NOISE_RE = re.compile(r'([<>]) (?:\[\{?"?|\{"?|")')
+
+# the header line of each change in the diff output (e.g. "12c12" or "3,4d2")
+_DIFF_HEADER_RE = re.compile("[0-9]+.*\n")
+
+# contents of a log file, or None if it cant be read (in which case it's never the same as any other log)
+def read_log_file( filename):
+	try:
+		with open(filename, 'rb') as f:
+			return( f.read())
+	except OSError:
+		return( None)
+
+# run the command, reading its output line by line while it runs instead of buffering all of it
+# returns the process (None if it couldnt be started) and an iterator over the lines of its stdout
+def run_command_streaming( command):
 	try:
-		process = subprocess.run( command.split(), stdout=subprocess.PIPE, stdin=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+		process = subprocess.Popen( command.split(), stdout=subprocess.PIPE, stdin=subprocess.DEVNULL, stderr=subprocess.DEVNULL, bufsize=-1)
 	except Exception as e:
 		error = "\nError running: " + command
 		print(error)
 		print(e)
-		return( error.encode('utf-8'), error.encode('utf-8'), 1) # non-zero return code
-	return( process.stderr, process.stdout, process.returncode)
+		return( None, [])
+	# invalid utf-8 bytes are kept as surrogates instead of failing the whole decode
+	return( process, io.TextIOWrapper( process.stdout, encoding='utf-8', errors='surrogateescape', newline="\n"))
+
+# diagnose the diff between two logs that aren't the same, as diff outputs it
+def diagnose_log_diff( old_log_filename, new_log_filename):
+	(diff_process, diff_lines) = run_command_streaming( "diff " + old_log_filename + " " + new_log_filename)
+	diagnosed = diagnose_all_diffs( diff_lines)
+	if diff_process is not None:
+		diff_lines.close()
+		diff_process.wait()
+	return( diagnosed)
 
 def diagnose_diff( diff_string):
     # [commit_newv, commit_oldv] = diff_string.split("\n---\n")
@@ -31,22 +113,22 @@ def diagnose_diff( diff_string):
 			diffs += [cur_diff]
 	return diffs
 
+# "<category>: <method name>", interned so that all the diagnoses of the same method are the same string
+# (there are usually lots of repeats) and removing the duplicates just compares pointers
+def method_diagnosis( category, method_name):
+	return( sys.intern( category + ": " + method_name))
+
+# the tag of a line of the diff (from _DIFF_LINE_TAGS), or None if it doesnt start with any of them
+def diff_line_tag( tag_re, line):
+	match = tag_re.match(line)
+	return( None if match is None else match.lastgroup)
+
 def diagnose_one_diff(commit_newv, commit_oldv):	
 	# get rid of the json noise
 	commit_newv = commit_newv.strip()
 	commit_oldv = commit_oldv.strip()
-	commit_newv = commit_newv.replace("> [", "> ")
-	commit_newv = commit_newv.replace("> {", "> ")
-	commit_newv = commit_newv.replace("> \"", "> ")
-	commit_newv = commit_newv.replace("< [", "< ")
-	commit_newv = commit_newv.replace("< {", "< ")
-	commit_newv = commit_newv.replace("< \"", "< ")
-	commit_oldv = commit_oldv.replace("> [", "> ")
-	commit_oldv = commit_oldv.replace("> {", "> ")
-	commit_oldv = commit_oldv.replace("> \"", "> ")
-	commit_oldv = commit_oldv.replace("< [", "< ")
-	commit_oldv = commit_oldv.replace("< {", "< ")
-	commit_oldv = commit_oldv.replace("< \"", "< ")
+	commit_newv = _JSON_NOISE_RE.sub(r"\1 ", commit_newv)
+	commit_oldv = _JSON_NOISE_RE.sub(r"\1 ", commit_oldv)
 	# end of the output list -- not relevant diff
 	if commit_newv.endswith("]"):
 		commit_newv = commit_newv[:len(commit_newv) - 1]
@@ -61,77 +143,83 @@ def diagnose_one_diff(commit_newv, commit_oldv):
 	if commit_oldv.startswith("> ") and commit_newv.startswith("< ") and commit_oldv[1:] == commit_newv[1:]:
 		return(None)
 
-	if commit_oldv.startswith("> error_"):
-		return( "Call_fails_oldv" + ": " + commit_oldv.split("_")[1].split("\n")[0]) # first "." is base.methodName
-	elif commit_newv.startswith("< error_"):
-		return( "Call_fails_newv" + ": " + commit_newv.split("_")[1].split("\n")[0])
-	elif (commit_newv.startswith("< done_") or commit_newv.startswith("< ret_val")) and commit_oldv == "":
-		return( "Call_fails_oldv" + ": " + commit_newv.split("_")[1].split("\n")[0])
-	elif (commit_oldv.startswith("> done_") or commit_oldv.startswith("> ret_val")) and commit_newv == "":
-		return( "Call_fails_newv" + ": " + commit_oldv.split("_")[1].split("\n")[0])
-	elif commit_newv.startswith("< done_") and commit_oldv.startswith("> done_"):
-		return( "Diff_internal_name" + ": " + commit_oldv.split("_")[1].split("\n")[0])
-	elif commit_newv.startswith("< ret_val_") and commit_oldv.startswith("> ret_val_"):
+	new_tag = diff_line_tag(_NEWV_TAG_RE, commit_newv)
+	old_tag = diff_line_tag(_OLDV_TAG_RE, commit_oldv)
+
+	if old_tag == "error":
+		return( method_diagnosis("Call_fails_oldv", commit_oldv.split("_")[1].split("\n")[0])) # first "." is base.methodName
+	elif new_tag == "error":
+		return( method_diagnosis("Call_fails_newv", commit_newv.split("_")[1].split("\n")[0]))
+	elif new_tag in _CALL_DONE_TAGS and commit_oldv == "":
+		return( method_diagnosis("Call_fails_oldv", commit_newv.split("_")[1].split("\n")[0]))
+	elif old_tag in _CALL_DONE_TAGS and commit_newv == "":
+		return( method_diagnosis("Call_fails_newv", commit_oldv.split("_")[1].split("\n")[0]))
+	elif new_tag == "done" and old_tag == "done":
+		return( method_diagnosis("Diff_internal_name", commit_oldv.split("_")[1].split("\n")[0]))
+	elif new_tag == "ret_val" and old_tag == "ret_val":
 		return( "Diff_return_value")
 	# ordering is important here: if the difference is not a return value (i.e. check after return)
 	# and the difference is not caught by one of the more general argument clauses below
 	# this is to diagnose an API function as being undefined (i.e. doesnt exist) in one case
-	elif commit_newv.startswith("< after_") and commit_oldv.startswith("> after_") and commit_newv.split(": ")[1].startswith("undefined"):
+	elif new_tag == "after" and old_tag == "after" and commit_newv.split(": ")[1].startswith("undefined"):
 		return( "API_func_no_longer_exists")
-	elif commit_newv.startswith("< before_") and commit_oldv.startswith("> before_"):
-		start_of_arg = commit_newv.split("\":")[1]
-		if start_of_arg.startswith("class ") or start_of_arg.startswith("function ") or start_of_arg.startswith("async ") or start_of_arg.startswith("("):
+	elif new_tag == "before" and old_tag == "before":
+		if commit_newv.split("\":")[1].startswith(_FUNCTION_ARG_PREFIXES):
 			return("Function_arg_impl_diff")
 		return( "Diff_API_argument_value")
-	elif commit_newv.startswith("< in_") and commit_oldv.startswith("> in_"):
-		start_of_arg = commit_newv.split("\":")[1]
-		if start_of_arg.startswith("class ") or start_of_arg.startswith("function ") or start_of_arg.startswith("async ") or start_of_arg.startswith("("):
+	elif new_tag in _IN_CALLBACK_TAGS and old_tag in _IN_CALLBACK_TAGS:
+		if commit_newv.split("\":")[1].startswith(_FUNCTION_ARG_PREFIXES):
 			return("Function_arg_impl_diff")
 		return( "Diff_callback_argument_value")
-	elif commit_newv.startswith("< callback_exec_"):
-		return( "Callback_called_newv_notcalled_oldv" + ": " + commit_newv.split("< callback_exec_")[1].split("\n")[0]) # name of method
-	elif commit_newv.startswith("< in_cb_"):
+	elif new_tag == "callback_exec":
+		return( method_diagnosis("Callback_called_newv_notcalled_oldv", commit_newv.split("< callback_exec_")[1].split("\n")[0])) # name of method
+	elif new_tag == "in_cb":
 		return( "Callback_called_newv_notcalled_oldv: " + " ARG_CASE")
-	elif commit_newv.startswith("< {\\\"async_error_in_test"):
+	elif new_tag == "async_error":
 		return( "Internal_async_error_newv")
-	elif commit_oldv.startswith("> callback_exec_"):
-		return( "Callback_notcalled_newv_called_oldv" + ": " + commit_oldv.split("> callback_exec_")[1].split("\n")[0]) # name of method
-	elif commit_oldv.startswith("> in_cb_"):
+	elif old_tag == "callback_exec":
+		return( method_diagnosis("Callback_notcalled_newv_called_oldv", commit_oldv.split("> callback_exec_")[1].split("\n")[0])) # name of method
+	elif old_tag == "in_cb":
 		return( "Callback_notcalled_newv_called_oldv: " + " ARG_CASE")
-	elif commit_oldv.startswith("> {\\\"async_error_in_test"):
+	elif old_tag == "async_error":
 		return( "Internal_async_error_oldv")	
-	elif commit_newv.startswith("<     ✓") and commit_oldv.startswith(">     ✓"): # timing artifact: meaningless diff
+	elif new_tag == "test_passed" and old_tag == "test_passed": # timing artifact: meaningless diff
 		return( None)
-	elif commit_newv.startswith("< \n<   test") or commit_oldv.startswith("> \n>   test"): # whitespace artifact on test completion: meaningless diff
+	elif new_tag == "test_done" or old_tag == "test_done": # whitespace artifact on test completion: meaningless diff
 		return( None)
-	elif commit_newv.find(" passing (") != -1 and commit_oldv.find(" passing (") != -1: # number of passing tests; difference in suite runtime
+	elif " passing (" in commit_newv and " passing (" in commit_oldv: # number of passing tests; difference in suite runtime
 		return( None)
-	elif commit_newv.startswith("< before_") or commit_oldv.startswith("> before_") or commit_newv.startswith("< after_") or commit_oldv.startswith("> after_"): # arg values outside call: ignore
+	elif new_tag in _ARG_VALUE_TAGS or old_tag in _ARG_VALUE_TAGS: # arg values outside call: ignore
 		return( None)
 	# test id spam
-	elif commit_oldv.startswith("> test_id") and commit_newv == "":
+	elif old_tag == "test_id" and commit_newv == "":
 		return( None)
-	elif commit_newv.startswith("< test_id") and commit_oldv == "":
+	elif new_tag == "test_id" and commit_oldv == "":
 		return( None)
-	elif commit_newv.find("Cannot find module '.") != -1: # this indicates a local module dependency that is not available in the newer commit 
-		return( "Local_file_renamed_or_removed")		  # happens when a file is renamed or deleted. Will not happen with commit_oldv since the tests are gen'd for this commit
-	elif commit_newv.find("Cannot find module '") != -1: # this indicates a NON-local module dependency that is not available in the newer commit 
-		return( "Nonlocal_dependency_removed")   		 # note: this needs to be *after* the previous check, since it would also catch the missing local modules
-	elif commit_newv.find("ReferenceError: primordials is not defined") != -1: # common error indicating a mismatch between grub and nodejs versions
-		return( "Grub_node_version_mismatch")								   # see: https://stackoverflow.com/questions/55921442/how-to-fix-referenceerror-primordials-is-not-defined-in-node
-	elif commit_newv.find("ReferenceError: ") != -1: # environment reference not included (primordials is one example)
-		return( "Env_ref_not_included")	
-	elif commit_newv.find("SyntaxError: ") != -1: # syntax error in new tests, due to language upgrade (probably CJS --> ESM)
-		return( "Syntax_err")	
-	else:
-		return("CATCHALL_UNDIAGNOSED")
+	# the rest are all errors in the output of the new commit tests: one scan of the line finds all of them, and then
+	# the highest priority one is reported (i.e. the order in _NEWV_ERROR_MSGS, same as if these were checked one at a time)
+	errors = [ match.lastgroup for match in _NEWV_ERROR_RE.finditer(commit_newv)]
+	for (error, msg) in _NEWV_ERROR_MSGS:
+		if error in errors:
+			return( error)
+	return("CATCHALL_UNDIAGNOSED")
+
+# diffs that cause many lines of terminal spam
+_NOISE_DIFFS = frozenset(["Local_file_renamed_or_removed", "Nonlocal_dependency_removed", "Grub_node_version_mismatch", "Env_ref_not_included", "Syntax_err"])
+
+# is the diff category (i.e. the part before the ":") one for the old commit
+def is_oldv_diff( d):
+	end = d.find(":")
+	return( d.endswith("oldv", 0, len(d) if end == -1 else end))
 
 def remove_noise_diffs( diff_list):
-	noise_diffs = ["Local_file_renamed_or_removed", "Nonlocal_dependency_removed", "Grub_node_version_mismatch", "Env_ref_not_included", "Syntax_err"]
-	if np.array([ noise_diffs.count(d) > 0 for d in diff_list]).any():
-		return( [ d for d in diff_list if d != "CATCHALL_UNDIAGNOSED" and not d.split(":")[0].endswith("oldv")]) # if the new commit test doesnt run, other diffs are meaningless
+	if any(d in _NOISE_DIFFS for d in diff_list):
+		return( [ d for d in diff_list if d != "CATCHALL_UNDIAGNOSED" and not is_oldv_diff(d)]) # if the new commit test doesnt run, other diffs are meaningless
 	return( diff_list)
 
+def diagnose_diff_if_nonempty( diff_string):
+	return( [] if len(diff_string) == 0 or diff_string.isspace() else diagnose_diff(diff_string))
+
 # no need to return since the list is passed by ref and modified in method
 def prune_until_equal( to_prune, elt1, elt2):
 	num_to_rem = min( to_prune.count(elt1), to_prune.count(elt2))
@@ -139,9 +227,19 @@ def prune_until_equal( to_prune, elt1, elt2):
 		to_prune.remove(elt1)
 		to_prune.remove(elt2)	
 
-def diagnose_all_diffs( diff_output):
-	diffs = [l for l in re.compile("(^|\n)[0-9]+.*\n").split( diff_output) if len(l) > 0 and not l.isspace()]
-	diagnosed = [ subd for d in diffs for subd in diagnose_diff(d)]
+# diff_lines: the lines of the diff output, read one at a time
+def diagnose_all_diffs( diff_lines):
+	diagnosed = []
+	cur_diff = []
+	for line in diff_lines:
+		if _DIFF_HEADER_RE.match(line):
+			# the header also ends the previous diff, and takes its last newline with it
+			cur_diff_string = "".join(cur_diff)
+			diagnosed += diagnose_diff_if_nonempty( cur_diff_string[:-1] if cur_diff_string.endswith("\n") else cur_diff_string)
+			cur_diff = []
+		else:
+			cur_diff += [line]
+	diagnosed += diagnose_diff_if_nonempty( "".join(cur_diff))
 	# if the only diff is an equal number of Internal_async_error_newv and Internal_async_error_oldv
 	# then this is indicative of a diff only due to the ordering of async executions 
 	# so, we remove matching internal async error counts	
@@ -149,7 +247,8 @@ def diagnose_all_diffs( diff_output):
 	#spec_calls = [d.split(": ")[1] for d in diagnosed if d is not None and d.startswith("Callback_called_newv_notcalled_oldv")]
 	#for call in spec_calls:
 	#	prune_until_equal(diagnosed, "Callback_called_newv_notcalled_oldv: " + call, "Callback_notcalled_newv_called_oldv: " + call)
-	diagnosed = [d if d is None else d.split(":")[0] for d in list(set(diagnosed))] # remove duplicates
+	# remove duplicates (keeping the order they were found in, so the output is the same on every run)
+	diagnosed = [d if d is None else d.split(":", 1)[0] for d in dict.fromkeys(diagnosed)]
 	# remove noise from extra output if the diff is one that causes many lines of terminal spam
 	# also, remove the function names (these were just here to distinguish them in the duplicate removal stage)
 	diagnosed = [d for d in remove_noise_diffs(diagnosed) if d is not None]
@@ -158,64 +257,51 @@ def diagnose_all_diffs( diff_output):
 	diagnosed = [] if diagnosed == [ "Diff_return_value" ] else diagnosed
 	return( diagnosed) 
 
-argparser = argparse.ArgumentParser(description="Diff analysis for ALT")
-argparser.add_argument("--commit_list_file", metavar="commit_list_file", type=str, nargs='?', help="list of commits to compute diffs for")
-argparser.add_argument("--commit_pair", metavar="commit_pair", type=str, nargs='?', help="specific pair of commits to compute diffs for")
-argparser.add_argument("--libname", metavar="libname", type=str, help="library name")
-argparser.add_argument("--numiters", metavar="numiters", type=int, help="number of iterations (for each test)")
-argparser.add_argument("--outputfile", metavar="outputfile", type=str, nargs='?', help="file to output to")
-argparser.add_argument("--diagnose_diffs", metavar="diagnose_diffs", type=bool, nargs='?', help="diagnose the diffs? true or false")
-argparser.add_argument("--data_dir", metavar="data_dir", type=str, nargs="?", help="directory where the data files (testlog and fswatch) are")
-argparser.add_argument("--diagnosed_diff_outfile", metavar="diagnosed_diff_outfile", type=str, nargs="?", help="file to output diff metadata to")
-args = argparser.parse_args()
-
-data_dir = args.data_dir if args.data_dir else "."
-
-fswatch_prefix = data_dir + "/fswatch_test" + args.libname
-log_prefix = data_dir + "/testlog_test" + args.libname 
-out_printer = None
-orig_stdout = sys.stdout
-#orig_print = print
-if args.outputfile:
-	out_printer = open(args.outputfile, 'w')
-	sys.stdout = out_printer
-	#print = out_printer.write
-commits = []
-if args.commit_list_file:
-	with open(args.commit_list_file) as f:
-		commits = f.read().split()
-elif args.commit_pair:
-	commits = args.commit_pair.split("_")
-
-# forward iterate through the commits
-#commits = commits[0:3]
-diff_map = {}
-while len(commits) > 1:
-	comp_commit = commits[0]
-	cur_commit = commits[1]
-	commits.remove(comp_commit)
+# the iteration number is only in the filename if there are multiple iterations
+def log_filename( prefix, numiters, i):
+	return( f"{prefix}.log" if numiters == 1 else f"{prefix}_{i}.log")
+
+# compare the test outputs of cur_commit with those of comp_commit
+# returns the key for the diff map, the diff map for this pair, and everything that was printed while comparing
+# (the pairs are analyzed in parallel, so the output is collected here to be printed in order)
+def analyze_pair( cur_commit, comp_commit, args, fswatch_prefix, log_prefix):
+	with contextlib.redirect_stdout( io.StringIO()) as pair_output:
+		(key, cur_diff_map) = analyze_pair_printing( cur_commit, comp_commit, args, fswatch_prefix, log_prefix)
+	return( key, cur_diff_map, pair_output.getvalue())
+
+def analyze_pair_printing( cur_commit, comp_commit, args, fswatch_prefix, log_prefix):
 	cur_diff_map = { "min_diff": None, "all_diffs": []}
 	print("\nComparing commit: " + cur_commit + " to " + comp_commit)
 	nodiff_log = False
 	nodiff_watch = False
 	min_diff_list = None
+	# the filenames only differ in the iteration number, so build the rest once
+	cur_commit_watch_prefix = f"{fswatch_prefix}_{cur_commit}_{cur_commit}"
+	cur_commit_log_prefix = f"{log_prefix}_{cur_commit}_{cur_commit}"
+	comp_commit_watch_prefix = f"{fswatch_prefix}_{cur_commit}_{comp_commit}"
+	comp_commit_log_prefix = f"{log_prefix}_{cur_commit}_{comp_commit}"
 	for cur_commit_iter in range( args.numiters):
+		# found a pair with no difference for both: no need to compare the rest
 		if nodiff_log and nodiff_watch:
-			continue
-		cur_commit_watch_filename = fswatch_prefix + "_" + cur_commit + "_" + cur_commit + ("" if args.numiters == 1 else "_" + str(cur_commit_iter)) + ".log"
-		cur_commit_log_filename = log_prefix + "_" + cur_commit + "_" + cur_commit + ("" if args.numiters == 1 else "_" + str(cur_commit_iter)) + ".log"
+			break
+		cur_commit_watch_filename = log_filename( cur_commit_watch_prefix, args.numiters, cur_commit_iter)
+		cur_commit_log_filename = log_filename( cur_commit_log_prefix, args.numiters, cur_commit_iter)
+		# these are the same for all the comp commit iterations, so only read them once
+		cur_commit_watch = read_log_file( cur_commit_watch_filename)
+		cur_commit_log = read_log_file( cur_commit_log_filename)
 		for comp_commit_iter in range( args.numiters):
-			comp_commit_watch_filename = fswatch_prefix + "_" + cur_commit + "_" + comp_commit + ("" if args.numiters == 1 else "_" + str(comp_commit_iter)) + ".log"
-			comp_commit_log_filename = log_prefix + "_" + cur_commit + "_" + comp_commit + ("" if args.numiters == 1 else "_" + str(comp_commit_iter)) + ".log"
+			comp_commit_watch_filename = log_filename( comp_commit_watch_prefix, args.numiters, comp_commit_iter)
+			comp_commit_log_filename = log_filename( comp_commit_log_prefix, args.numiters, comp_commit_iter)
 			print(comp_commit_log_filename)
 			if not nodiff_log:	
-				(difflog_err, difflog_out, difflog_retcode) = run_command( "diff " + comp_commit_log_filename + " " + cur_commit_log_filename)
-				if difflog_retcode == 0:
+				# compare the logs in-process: only run diff if they're not the same
+				comp_commit_log = read_log_file( comp_commit_log_filename)
+				if comp_commit_log is not None and comp_commit_log == cur_commit_log:
 					print("\nno difference: " + cur_commit_log_filename + " --- " + comp_commit_log_filename)
 					nodiff_log = True
 					min_diff_list = []
 				elif args.diagnose_diffs:
-					cur_diff_list = diagnose_all_diffs( difflog_out.decode('utf-8'))
+					cur_diff_list = diagnose_log_diff( comp_commit_log_filename, cur_commit_log_filename)
 					min_diff_list = cur_diff_list if not min_diff_list or len(cur_diff_list) < len(min_diff_list) else min_diff_list
 					cur_diff_map["all_diffs"] += [cur_diff_list]
 					if len( cur_diff_list) == 0:
@@ -223,10 +309,13 @@ while len(commits) > 1:
 						nodiff_log = True
 						min_diff_list = []
 			if not nodiff_watch:
-				(diffwatch_err, diffwatch_out, diffwatch_retcode) = run_command( "diff " + comp_commit_watch_filename + " " + cur_commit_watch_filename)
-				if diffwatch_retcode == 0:
+				# the watch diff output isnt used, so only check if they're the same
+				comp_commit_watch = read_log_file( comp_commit_watch_filename)
+				if comp_commit_watch is not None and comp_commit_watch == cur_commit_watch:
 					print("\nno difference: " + cur_commit_watch_filename + " --- " + comp_commit_watch_filename)
 					nodiff_watch = True
+			if nodiff_log and nodiff_watch:
+				break
 	if nodiff_log and nodiff_watch:
 		print("\nSame behaviour between commits " + cur_commit + " and commit " + comp_commit)
 	else:
@@ -235,21 +324,73 @@ while len(commits) > 1:
 		print("\nMin diff:")
 		print(min_diff_list)
 	cur_diff_map["min_diff"] = min_diff_list
-	diff_map[cur_commit + "_" + comp_commit] = cur_diff_map
-
-if out_printer:
-	sys.stdout = orig_stdout
-	out_printer.close()
-#	print = orig_print
-
-if args.diagnosed_diff_outfile:
-	with open(args.diagnosed_diff_outfile, 'w') as outf:
-		outf.write(json.dumps(diff_map, indent=4))
-else:
-	# print total number of diffs
-	total_diffs = 0
-	min_diffs = []
-	for key in diff_map.keys():
-		min_diffs = min_diffs + diff_map[key]["min_diff"]
-	total_diffs = len(min_diffs)
-	print(min_diffs)
\ No newline at end of file
+	return( cur_commit + "_" + comp_commit, cur_diff_map)
+
+argparser = argparse.ArgumentParser(description="Diff analysis for ALT")
+argparser.add_argument("--commit_list_file", metavar="commit_list_file", type=str, nargs='?', help="list of commits to compute diffs for")
+argparser.add_argument("--commit_pair", metavar="commit_pair", type=str, nargs='?', help="specific pair of commits to compute diffs for")
+argparser.add_argument("--libname", metavar="libname", type=str, help="library name")
+argparser.add_argument("--numiters", metavar="numiters", type=int, help="number of iterations (for each test)")
+argparser.add_argument("--outputfile", metavar="outputfile", type=str, nargs='?', help="file to output to")
+argparser.add_argument("--diagnose_diffs", metavar="diagnose_diffs", type=bool, nargs='?', help="diagnose the diffs? true or false")
+argparser.add_argument("--data_dir", metavar="data_dir", type=str, nargs="?", help="directory where the data files (testlog and fswatch) are")
+argparser.add_argument("--diagnosed_diff_outfile", metavar="diagnosed_diff_outfile", type=str, nargs="?", help="file to output diff metadata to")
+
+def main():
+	args = argparser.parse_args()
+
+	data_dir = args.data_dir if args.data_dir else "."
+
+	fswatch_prefix = data_dir + "/fswatch_test" + args.libname
+	log_prefix = data_dir + "/testlog_test" + args.libname 
+	out_printer = None
+	orig_stdout = sys.stdout
+	#orig_print = print
+	if args.outputfile:
+		out_printer = open(args.outputfile, 'w')
+		sys.stdout = out_printer
+		#print = out_printer.write
+	commits = []
+	if args.commit_list_file:
+		with open(args.commit_list_file) as f:
+			commits = f.read().split()
+	elif args.commit_pair:
+		commits = args.commit_pair.split("_")
+
+	# forward iterate through the commits
+	#commits = commits[0:3]
+	diff_map = {}
+	pairs = [ (commits[i + 1], commits[i]) for i in range( len(commits) - 1)]
+	if len(pairs) <= 1:
+		# a single pair (e.g. --commit_pair): not worth starting a process pool for
+		for (cur_commit, comp_commit) in pairs:
+			(key, cur_diff_map) = analyze_pair_printing( cur_commit, comp_commit, args, fswatch_prefix, log_prefix)
+			diff_map[key] = cur_diff_map
+	else:
+		with ProcessPoolExecutor() as executor:
+			pair_futures = [ executor.submit( analyze_pair, cur_commit, comp_commit, args, fswatch_prefix, log_prefix) for (cur_commit, comp_commit) in pairs]
+			# collect the results in commit order, so the output is the same as comparing the pairs one after the other
+			for pair_future in pair_futures:
+				(key, cur_diff_map, pair_output) = pair_future.result()
+				print(pair_output, end="")
+				diff_map[key] = cur_diff_map
+
+	if out_printer:
+		sys.stdout = orig_stdout
+		out_printer.close()
+	#	print = orig_print
+
+	if args.diagnosed_diff_outfile:
+		with open(args.diagnosed_diff_outfile, 'wb') as outf:
+			outf.write(dumps_json(diff_map))
+	else:
+		# print total number of diffs
+		total_diffs = 0
+		min_diffs = []
+		for key in diff_map.keys():
+			min_diffs = min_diffs + diff_map[key]["min_diff"]
+		total_diffs = len(min_diffs)
+		print(min_diffs)
+
+if __name__ == "__main__":
+	main()
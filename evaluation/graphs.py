@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -5,24 +6,32 @@ import matplotlib.pyplot as plt
 def plot_coverage_testgenmodes(lib_name, num_tests, num_reps, show_full_yrange=False):
 	modes = ["OGNessie", "TrackPrimitives", "MergeDiscGen", "ChainedMethods"]
 
+	# bounds of the stdev band around the means, reused for every mode
+	upper = np.empty(num_tests, dtype=np.float32)
+	lower = np.empty(num_tests, dtype=np.float32)
+	# one row per rep, filled in as the files are read (and reused for every mode)
+	all_reps_data = np.empty((num_reps, num_tests), dtype=np.float32)
 	for mode in modes:
-		reps_data = []
+		num_valid_reps = 0
 		for rep in range(1, num_reps + 1):
 			filename = mode + "_" + str(num_tests) + "_" + lib_name + "_rep" + str(rep)
-			with open(filename) as f:
-				# skip empty lines
-				new_data = [float(x) for x in f.read().split("\n") if len(x) > 0]
-				if len(new_data) != num_tests:
-					print("UH OH: rep " + filename + " has len " + str(len(new_data)) + "; expected len " + str(num_tests))
-					continue
-				reps_data += [new_data]
-		reps_data = np.array(reps_data).transpose()
-		means = np.mean(reps_data, axis=1)
+			# loadtxt skips empty lines
+			new_data = np.loadtxt(filename, dtype=np.float32, ndmin=1)
+			if new_data.size != num_tests:
+				print("UH OH: rep " + filename + " has len " + str(new_data.size) + "; expected len " + str(num_tests))
+				continue
+			all_reps_data[num_valid_reps] = new_data
+			num_valid_reps += 1
+		# the rows are contiguous, so this is a view (no copy)
+		reps_data = all_reps_data[:num_valid_reps]
+		means = np.mean(reps_data, axis=0)
 		plt.plot(means, label=mode)
 		# no stdevs if there is only one run
 		if len(reps_data) > 1:
-			stdevs = np.std(reps_data, axis=1)
-			plt.fill_between(range(0, num_tests), means+stdevs, means-stdevs, alpha=0.2, linewidth=0.5)
+			stdevs = np.std(reps_data, axis=0)
+			np.add(means, stdevs, out=upper)
+			np.subtract(means, stdevs, out=lower)
+			plt.fill_between(range(0, num_tests), upper, lower, alpha=0.2, linewidth=0.5)
 	plt.legend()
 	plt.xlabel("Tests")
 	plt.ylabel("Stmt coverage (%)")
@@ -33,22 +42,14 @@ def plot_coverage_testgenmodes(lib_name, num_tests, num_reps, show_full_yrange=F
 
 
 def main():
-	# lib_name = "memfs"
-	# num_tests = 500
-	# num_reps = 4
+	argparser = argparse.ArgumentParser(description="Plot the coverage of the tests generated with each test generation mode")
+	argparser.add_argument("--lib_name", metavar="lib_name", type=str, default="zipafolder", help="library name (in the coverage filenames)")
+	argparser.add_argument("--num_tests", metavar="num_tests", type=int, default=500, help="number of tests generated in each rep")
+	argparser.add_argument("--num_reps", metavar="num_reps", type=int, default=10, help="number of reps for each mode")
+	argparser.add_argument("--show_full_yrange", action="store_true", help="show the full coverage range (0 to 1) on the y axis")
+	args = argparser.parse_args()
 
-	# lib_name = "fsextra"
-	# num_tests = 500
-	# num_reps = 7
+	plot_coverage_testgenmodes(args.lib_name, args.num_tests, args.num_reps, args.show_full_yrange)
 
-	# lib_name = "q"
-	# num_tests = 500
-	# num_reps = 7
-
-	lib_name = "zipafolder"
-	num_tests = 500
-	num_reps = 10
-
-	plot_coverage_testgenmodes(lib_name, num_tests, num_reps)
-
-main()
+if __name__ == "__main__":
+	main()
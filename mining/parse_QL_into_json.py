@@ -17,31 +17,44 @@
 # }
 
 import sys
+import re
+from itertools import islice
 import json
 
+# one line of the QL output: the AP (starting with "use or "def, and including the package name in its module) then the two sigs
+QL_LINE_RE = re.compile(r'^"(?:use|def) (?P<acc_path>[^"]*?module (?P<pkg>[^)"]*)[^"]*)","(?P<sig_with_types>.*?)","(?P<sig_with_values>.*?)"?\s*$')
+
+INDENT = " " * 4
+
 def parse_line_into_json(line):
-	comps = line.replace("\"\n", "").split("\",\"")
-	ret = {}
-	# first element is the AP: starts with "use or "def
-	if comps[0][0:5] == "\"use " or comps[0][0:5] == "\"def ":
-		ret["pkg"] = comps[0][5:].split("module ")[1].split(")")[0]
-		ret["acc_path"] = comps[0][5:]
-	else:
-		print("UH OH: invalid pkg and acc_path from: " + comps[0])
-		return(ret)
-	ret["sig_with_types"] = comps[1]
-	ret["sig_with_values"] = comps[2]
-	return(ret)
+	match = QL_LINE_RE.match(line)
+	if match is None:
+		print("UH OH: invalid pkg and acc_path from: " + line.split("\",\"")[0], file=sys.stderr)
+		return(None)
+	return({ "pkg": match["pkg"], "acc_path": match["acc_path"], "sig_with_types": match["sig_with_types"], "sig_with_values": match["sig_with_values"]})
+
+
+# same output as json.dumps(list_of_records, indent=4), but written one record at a time
+# instead of building the whole list (and then the whole string) in memory first
+def write_json_list(records, out):
+	write = out.write # bound once, this is called for every record
+	write("[")
+	first = True
+	for record in records:
+		write(("\n" if first else ",\n") + INDENT + json.dumps(record, indent=4).replace("\n", "\n" + INDENT))
+		first = False
+	write("]\n" if first else "\n]\n")
 
+# the parsed records of the QL output lines (minus the invalid ones)
+def parse_lines(lines):
+	for line in islice(lines, 1, None): # skip the header line
+		line_json = parse_line_into_json(line)
+		if line_json is not None:
+			yield line_json
 
 def main():
 	QL_results_file = sys.argv[1]
-	res = []
 	with open(QL_results_file) as f:
-		next(f, None) # skip the header line
-		for line in f:
-			line_json = parse_line_into_json(line)
-			res += [line_json]
-	print(json.dumps(res, indent=4))
+		write_json_list(parse_lines(f), sys.stdout)
 
 main()